@@ -24,16 +24,97 @@
 
 import asyncio
 import json
+import os
+import threading
+from contextlib import aclosing
+from dataclasses import dataclass
+from functools import lru_cache
 from hashlib import sha256
 from itertools import groupby
-from typing import Any, Dict, List, Union
+from operator import itemgetter
+from typing import Any, AsyncGenerator, Dict, Iterable, List, Set, Tuple, Union
 
 from eth_account._utils.signing import to_standard_signature_bytes
-from eth_account.datastructures import HexBytes
 from eth_keys.main import Signature
+from eth_utils import keccak, to_checksum_address
 
 from open_autonomy_client.downloader import SmartDownloader
 
+try:
+    import coincurve
+except ImportError:  # pragma: nocover
+    coincurve = None  # type: ignore  # pylint: disable=invalid-name
+
+try:
+    import uvloop
+except ImportError:  # pragma: nocover
+    uvloop = None  # type: ignore  # pylint: disable=invalid-name
+
+# libsecp256k1 bindings are used for public key recovery if installed,
+# set USE_COINCURVE=false to use the eth_keys backend instead
+USE_COINCURVE = coincurve is not None and os.environ.get(
+    "USE_COINCURVE", "true"
+).lower() not in ("0", "false", "no")
+
+
+def new_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Create new event loop, uvloop one if installed.
+
+    :return: event loop
+    """
+    if uvloop is not None:
+        return uvloop.new_event_loop()
+    return asyncio.new_event_loop()  # pragma: nocover
+
+
+@lru_cache(maxsize=64)
+def _parse_signature(signature_str: str) -> bytes:
+    """
+    Parse hex encoded signature to standard (r, s, v) form bytes.
+
+    Cached: agents return the same signatures until the service state changes.
+
+    :param signature_str: hex encoded signature byte string
+
+    :return: signature bytes
+    """
+    return to_standard_signature_bytes(bytes.fromhex(signature_str))
+
+
+def _recover_address(signature: bytes, data_hash: bytes) -> bytes:
+    """
+    Recover address of the key the data hash was signed with.
+
+    Verification kernel, kept a plain function to skip the classmethods dispatch
+    on the hot path.
+
+    :param signature: 65 bytes signature in standard (r, s, v) form
+    :param data_hash: 32 bytes hash digest of the data signature created for.
+
+    :return: 20 bytes of recovered key address
+    """
+    if USE_COINCURVE:
+        public_key = coincurve.PublicKey.from_signature_and_message(
+            signature, data_hash, hasher=None
+        )
+        return keccak(public_key.format(compressed=False)[1:])[-20:]
+    return (
+        Signature(signature_bytes=signature)
+        .recover_public_key_from_msg_hash(data_hash)
+        .to_canonical_address()
+    )
+
+
+@dataclass(slots=True)
+class AgentResponse:
+    """Agent response, payload is hashed once on fetch."""
+
+    url: str
+    payload_str: str
+    payload_hash: bytes
+    sigs: Dict[str, str]
+
 
 class SignatureChecker:  # pylint: disable=too-few-public-methods
     """Signature checker."""
@@ -41,60 +122,101 @@ class SignatureChecker:  # pylint: disable=too-few-public-methods
     hash_algo = sha256
 
     @classmethod
-    def check(cls, key_addr: str, signature_str: str, data_str: str) -> None:
+    def check(
+        cls, key_addr: str, signature_str: str, data_str: Union[str, bytes]
+    ) -> None:
         """
         Check signature for payload and public key(address) provided.
 
         :param key_addr: str, pub key checksum address
         :param signature_str: hex encoded signature byte string
-        :param data_str: data signature created for.
+        :param data_str: data signature created for, str or ascii encoded bytes.
+        """
+        if isinstance(data_str, str):
+            data_str = data_str.encode("ascii")
+        cls.check_hash(key_addr, signature_str, cls.get_data_hash(data_str))
+
+    @classmethod
+    def check_hash(
+        cls, key_addr: Union[str, bytes], signature_str: str, data_hash: bytes
+    ) -> None:
+        """
+        Check signature for payload hash and public key(address) provided.
+
+        Addresses are compared as raw bytes, no checksum address computed.
+
+        :param key_addr: pub key checksum address or its raw bytes
+        :param signature_str: hex encoded signature byte string
+        :param data_hash: hash digest of the data signature created for.
 
         :raises ValueError: if signature verification failed.
         """
-        signature = cls._load_signature(signature_str)
-        data_hash = cls._get_data_hash(data_str)
-        recovered_key_address = signature.recover_public_key_from_msg_hash(
-            data_hash
-        ).to_checksum_address()
+        if isinstance(key_addr, str):
+            key_addr = cls.load_key(key_addr)
+        recovered_key_address = _recover_address(
+            _parse_signature(signature_str), data_hash
+        )
         if recovered_key_address != key_addr:
             raise ValueError(
-                f"signature verification failed for key: {key_addr}, recovered key is {recovered_key_address}"
+                f"signature verification failed for key: {to_checksum_address(key_addr)}, "
+                f"recovered key is {to_checksum_address(recovered_key_address)}"
             )
 
     @classmethod
-    def _load_key(cls, key_str: str) -> str:
-        """Load key string.
+    def batch_check(cls, items: Iterable[Tuple[Union[str, bytes], str, bytes]]) -> None:
+        """
+        Check signatures in batch.
 
-        :param key_str: str, pub key or agent address
+        :param items: (key address, hex encoded signature, data hash) tuples
 
-        :return: str
+        :raises ValueError: if any of signatures verification failed.
         """
-        return key_str.lower()
+        for key_addr, signature_str, data_hash in items:
+            cls.check_hash(key_addr, signature_str, data_hash)
 
     @classmethod
-    def _load_signature(cls, signature_str: str) -> Signature:
+    async def batch_check_async(
+        cls, items: Iterable[Tuple[Union[str, bytes], str, bytes]]
+    ) -> None:
         """
-        Load signature from hex string.
+        Check signatures in batch, without blocking the event loop.
 
-        :param signature_str: hex encoded signature byte string
+        libsecp256k1 public key recovery releases the GIL, so the whole batch
+        is checked in one of the default executor threads. A thread per signature
+        would cost more than the recovery itself. The pure python eth_keys
+        recovery holds the GIL, so it is checked inline.
 
-        :return: signature object
+        :param items: (key address, hex encoded signature, data hash) tuples
+
+        :raises ValueError: if any of signatures verification failed.
         """
-        signature_bytes_standard = to_standard_signature_bytes(
-            HexBytes(bytes.fromhex(signature_str))
-        )
-        return Signature(signature_bytes=signature_bytes_standard)
+        if USE_COINCURVE:
+            await asyncio.to_thread(cls.batch_check, items)
+        else:
+            cls.batch_check(items)
 
     @classmethod
-    def _get_data_hash(cls, data_str: str) -> bytes:
+    def load_key(cls, key_str: str) -> bytes:
+        """Load key string.
+
+        :param key_str: str, pub key or agent address, hex encoded
+
+        :return: address bytes
+        """
+        if key_str[:2].lower() == "0x":
+            key_str = key_str[2:]
+        return bytes.fromhex(key_str)
+
+    @classmethod
+    def get_data_hash(cls, data_bytes: bytes) -> bytes:
         """
         Get data hash for data.
 
-        :param data_str: data signature created for.
+        :param data_bytes: ascii encoded data signature created for.
 
         :return: hash digest in bytes
         """
-        return cls.hash_algo(data_str.encode("ascii")).digest()
+        return cls.hash_algo(data_bytes).digest()
 
 
 class Client:
@@ -120,8 +242,10 @@ class Client:
             raise ValueError("Amount of urls and keys has to match!")
 
         self._urls = urls
-        self._keys = keys
+        self._keys_set = frozenset(keys)
+        self._keys_bytes = {key: SignatureChecker.load_key(key) for key in keys}
         self._downloader = self._get_downloader(**downloader_kwargs)
+        self._thread_local = threading.local()
 
     @staticmethod
     def _get_downloader(**kwargs: Any) -> SmartDownloader:
@@ -135,72 +259,141 @@ class Client:
         kwargs["concurrent_requests"] = kwargs.get("concurrent_requests", 2)
         return SmartDownloader(**kwargs)
 
-    async def _fetch_data_from_urls(self) -> Dict[str, Union[Dict, Exception]]:
+    async def _iter_data_from_urls(self) -> AsyncGenerator[Tuple[str, Dict], None]:
         """
-        Fetch data using downloader.
+        Fetch data using downloader, yield json responses as soon as downloaded.
 
-        :return: dict of url, dict json responses.
+        :yield: pairs of url, dict json response.
         :raises ValueError: if download errors
         """
-        fetched_urls = await self._downloader.download(self._urls)
-        good, bad = self._downloader.filter_responses(fetched_urls)
-        if bad:
+        bad: Dict[str, Exception] = {}
+        got_good = False
+        is_good_response = self._downloader.is_good_response
+        async with aclosing(self._downloader.iter_download(self._urls)) as downloads:
+            async for url, data in downloads:
+                if is_good_response(data):
+                    got_good = True
+                    yield url, data  # type: ignore
+                else:
+                    bad[url] = data  # type: ignore
+        if not got_good:
             raise ValueError(f"Downloads errors: {bad}")
-        return good
 
-    def _check_signatures(self, urls_data: Dict[str, Dict]) -> None:
+    def _get_response(self, url: str, data: Dict) -> AgentResponse:
         """
-        Check signatures for data downloaded.
+        Wrap json response, payload is hashed once for all the checks.
 
-        :param urls_data: Dict[str, Dict of json data]
+        :param url: url the response downloaded from
+        :param data: dict of json data
+
+        :return: agent response
         """
-        for _, data in urls_data.items():
-            self._check_data_signatures(data)  # type: ignore
+        payload = self._get_payload_from_data(data)
+        return AgentResponse(
+            url=url,
+            payload_str=payload,
+            payload_hash=SignatureChecker.get_data_hash(payload.encode("ascii")),
+            sigs=self._get_signatures_from_data(data),
+        )
 
-    def _check_data_signatures(self, data: str) -> None:
+    def _schedule_signatures_check(
+        self,
+        response: AgentResponse,
+        scheduled: Set[Tuple[bytes, str, bytes]],
+    ) -> asyncio.Task:
+        """
+        Schedule signatures verification for the response, while others are downloading.
 
-        payload = self._get_payload_from_data(data)  # type: ignore
-        signatures = self._get_signatures_from_data(data)  # type: ignore
+        Agents responses usually carry the same signatures:
+        every unique (key, signature, data hash) is verified once.
+
+        :param response: agent response
+        :param scheduled: set of signatures scheduled for verification already
+
+        :return: verification task
+        """
+        items = [
+            item
+            for item in self._check_data_signatures(response)
+            if item not in scheduled
+        ]
+        scheduled.update(items)
+        return asyncio.create_task(self._verify_signatures(items))
+
+    def _check_data_signatures(
+        self, response: AgentResponse
+    ) -> List[Tuple[bytes, str, bytes]]:
+        """
+        Check signatures present for the registered keys, collect them to verify.
+
+        :param response: agent response
+
+        :return: list of (key address bytes, signature, data hash) to verify
+        :raises ValueError: if no signatures found for some of the registered keys
+        """
+        signatures = response.sigs
 
         # check signatures keys, match registered keys
-        signatures_not_present = set(self._keys) - set(signatures.keys())
+        signatures_not_present = self._keys_set - signatures.keys()
         if signatures_not_present:
             raise ValueError(f"No signatures found for keys: {signatures_not_present}")
 
-        for key, signature in signatures.items():
-            self._verify_signature(key, signature, payload)
+        keys_bytes = self._keys_bytes
+        data_hash = response.payload_hash
+        return [
+            (
+                keys_bytes.get(key) or SignatureChecker.load_key(key),
+                signature,
+                data_hash,
+            )
+            for key, signature in signatures.items()
+        ]
 
     @staticmethod
-    def _verify_signature(key_addr: str, signature_str: str, data: str) -> None:
+    async def _verify_signatures(items: List[Tuple[bytes, str, bytes]]) -> None:
         """
-        Perform signature verification.
+        Perform signatures verification.
 
-        :param key_addr: str, pub key or agent address
-        :param signature_str: hex encoded signature byte string
-        :param data: data signature created for.
+        :param items: list of (key address bytes, hex encoded signature, data hash)
         """
-        SignatureChecker.check(key_addr, signature_str=signature_str, data_str=data)
+        await SignatureChecker.batch_check_async(items)
 
-    def _check_payload_the_same(self, urls_data: Dict[str, str]) -> None:
+    @classmethod
+    def _check_payload_the_same(cls, responses: List[AgentResponse]) -> None:
         """
         Ensure payload the same for every url response.
 
-        :param urls_data: Dict[str, Dict of json data]
+        Payloads are compared by their hashes.
+
+        :param responses: list of agents responses
 
         :raises ValueError: if payloads differ
         """
-        # TODO: hashes?, but need recalculate manually  # pylint: disable=fixme
-        groups = list(
-            groupby(
-                sorted(
-                    urls_data.items(), key=lambda x: self._get_payload_from_data(x[1])  # type: ignore
-                ),
-                key=lambda x: self._get_payload_from_data(x[1]),  # type: ignore
-            )
+        hashes = (response.payload_hash for response in responses)
+        first_hash = next(hashes, None)
+        if first_hash is None or any(
+            payload_hash != first_hash for payload_hash in hashes
+        ):
+            groups = cls._diagnose_payload_mismatch(responses)
+            raise ValueError(f"payload differs, urls grouped by payload: {groups}")
+
+    @staticmethod
+    def _diagnose_payload_mismatch(responses: List[AgentResponse]) -> List[List[str]]:
+        """
+        Group urls by the payload responded, to report payloads mismatch.
+
+        :param responses: list of agents responses
+
+        :return: list of urls groups
+        """
+        url_hashes = sorted(
+            ((response.url, response.payload_hash) for response in responses),
+            key=itemgetter(1),
         )
-        if len(groups) != 1:
-            # TODO: show better details with groups of urls
-            raise ValueError("payload differs")
+        return [
+            [url for url, _ in group]
+            for _, group in groupby(url_hashes, key=itemgetter(1))
+        ]
 
     @staticmethod
     def _get_payload_from_data(url_data: Dict) -> str:
@@ -229,6 +422,9 @@ class Client:
         """
         Decode payload.
 
+        Standard json decoder is used for the signed payload: it keeps big integers
+        (e.g. uint256 amounts) exact and accepts NaN and Infinity values.
+
         :param payload: str
 
         :return: dict
@@ -241,18 +437,69 @@ class Client:
 
         :return: dict with service state data
         """
-        urls_data = await self._fetch_data_from_urls()
-        self._check_payload_the_same(urls_data)  # type: ignore
-        self._check_signatures(urls_data)  # type: ignore
-        return self._decode_payload(
-            self._get_payload_from_data(list(urls_data.values())[0])  # type: ignore
-        )
+        responses: List[AgentResponse] = []
+        verifications: List[asyncio.Task] = []
+        scheduled: Set[Tuple[bytes, str, bytes]] = set()
+        try:
+            async with aclosing(self._iter_data_from_urls()) as urls_data:
+                async for url, data in urls_data:
+                    response = self._get_response(url, data)
+                    responses.append(response)
+                    verifications.append(
+                        self._schedule_signatures_check(response, scheduled)
+                    )
+            self._check_payload_the_same(responses)
+            await asyncio.gather(*verifications)
+        finally:
+            for verification in verifications:
+                verification.cancel()
+            await asyncio.gather(*verifications, return_exceptions=True)
+        return self._decode_payload(responses[0].payload_str)
+
+    def __enter__(self) -> "Client":
+        """
+        Enter client context.
+
+        :return: client instance
+        """
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """
+        Exit client context, close the event loop of the current thread.
+
+        :param exc_info: exception info if any
+        """
+        self.close()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """
+        Get current thread event loop to fetch the data synchronously.
+
+        Loop is created on first use, every thread uses its own one.
+
+        :return: event loop
+        """
+        loop = getattr(self._thread_local, "loop", None)
+        if loop is None or loop.is_closed():
+            loop = self._thread_local.loop = new_event_loop()
+        return loop
 
     def fetch_sync(self) -> Dict:
         """
         Fetch data from urls and check sigantures.
 
+        The event loop is kept between the calls, use the client as a context manager
+        or call `close` to release it.
+
         :return: dict with service state data
         """
-        loop = asyncio.get_event_loop()
-        return loop.run_until_complete(self.fetch())
+        return self._get_loop().run_until_complete(self.fetch())
+
+    def close(self) -> None:
+        """Close the event loop used by the current thread to fetch the data."""
+        loop = getattr(self._thread_local, "loop", None)
+        self._thread_local.loop = None
+        if loop is not None and not loop.is_closed():
+            loop.run_until_complete(loop.shutdown_default_executor())
+            loop.close()
@@ -24,17 +24,83 @@
 
 import asyncio
 from abc import ABC, abstractmethod
-from contextlib import asynccontextmanager, suppress
-from typing import Dict, List, Tuple, Union
+from contextlib import aclosing
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple, Union
 
 import aiohttp
 
+try:
+    from orjson import loads as json_loads
+except ImportError:  # pragma: nocover
+    from json import loads as json_loads  # type: ignore
+
 
 class BaseDownloader(ABC):
     """Base downloader class with basic utility methods."""
 
-    @staticmethod
-    async def _download_from_url(url: str) -> Union[Dict, Exception]:
+    def __init__(self) -> None:
+        """Init downloader."""
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._active_batches = 0
+
+    async def __aenter__(self) -> "BaseDownloader":
+        """
+        Enter downloader context.
+
+        :return: downloader instance
+        """
+        self._active_batches += 1
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        """
+        Exit downloader context, close http session once no batch is using it.
+
+        :param exc_info: exception info if any
+        """
+        self._active_batches -= 1
+        if not self._active_batches:
+            await self.aclose()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Get http session, create one on first use.
+
+        Session is shared by all the downloads, including the ones of concurrent
+        batches, so the connections are reused.
+
+        :return: aiohttp client session
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self._get_connections_limit(),
+                    limit_per_host=0,
+                    use_dns_cache=True,
+                    ttl_dns_cache=300,
+                    keepalive_timeout=30,
+                    enable_cleanup_closed=True,
+                )
+            )
+        return self._session
+
+    def _get_connections_limit(self) -> int:
+        """
+        Get connections pool size of the session.
+
+        Agents are usually served by distinct hosts, so the pool is not limited.
+
+        :return: max amount of connections, 0 for no limit
+        """
+        return 0
+
+    async def aclose(self) -> None:
+        """Close http session."""
+        session, self._session = self._session, None
+        if session is not None:
+            await session.close()
+
+    async def _download_from_url(self, url: str) -> Union[Dict, Exception]:
         """
         Download data from url.
 
@@ -43,16 +109,34 @@ class BaseDownloader(ABC):
         :return: json decoded dict or exception instance
         """
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as resp:
-                    resp.raise_for_status()
-                    body = await resp.json()
-            return body
+            async with self._get_session().get(url) as resp:
+                resp.raise_for_status()
+                raw = await resp.read()
         except Exception as exc:  # pylint: disable=broad-except
+            # any url failure is the url response, not the whole batch failure
             return exc
 
-    @classmethod
-    def is_good_response(cls, resp: Union[Exception, Dict]) -> bool:
+        # decode once the connection is released back to the pool
+        try:
+            return json_loads(raw)
+        except ValueError as exc:
+            return exc
+
+    async def _download_all(self, urls: List[str]) -> Dict[str, Union[Dict, Exception]]:
+        """
+        Download data from all the urls concurrently.
+
+        :param urls: list of url strings
+
+        :return: dict of urls and responses(dict or json)
+        """
+        results = await asyncio.gather(
+            *(self._download_from_url(url) for url in urls), return_exceptions=True
+        )
+        return dict(zip(urls, results))  # type: ignore
+
+    @staticmethod
+    def is_good_response(resp: Union[Exception, Dict]) -> bool:
         """
         Check response is not exception instance.
 
@@ -76,13 +160,13 @@ class BaseDownloader(ABC):
 
         :return: (dict[str, dict], dict[str, exception])
         """
-        good = {}
-        bad = {}
-        for url, resp in url_responses.items():
-            if cls.is_good_response(resp):
-                good[url] = resp
-            else:
-                bad[url] = resp
+        is_good_response = cls.is_good_response
+        good = {
+            url: resp for url, resp in url_responses.items() if is_good_response(resp)
+        }
+        if len(good) == len(url_responses):
+            return good, {}
+        bad = {url: resp for url, resp in url_responses.items() if url not in good}
         return good, bad
 
     @abstractmethod
@@ -98,7 +182,7 @@ class BaseDownloader(ABC):
 
 
 class SimpleDownloader(BaseDownloader):
-    """Simple downloader, loads data sequentially."""
+    """Simple downloader, loads all the data concurrently."""
 
     async def download(self, urls: List[str]) -> Dict[str, Union[Dict, Exception]]:
         """
@@ -108,7 +192,8 @@ class SimpleDownloader(BaseDownloader):
 
         :return: dict of urls and responses(dict or json)
         """
-        return {url: await self._download_from_url(url) for url in urls}
+        async with self:
+            return await self._download_all(urls)
 
 
 class AllInParallelDownloader(BaseDownloader):
@@ -121,20 +206,9 @@ class AllInParallelDownloader(BaseDownloader):
         :param urls: list of url strings
 
         :return: dict of urls and responses(dict or json)
-        :raises ValueError: if there are pending tasks after retrieving the results
         """
-        task_mapping = {}
-
-        for url in urls:
-            task = asyncio.ensure_future(self._download_from_url(url))
-            task_mapping[task] = url
-
-        done, pending = await asyncio.wait(
-            task_mapping.keys(), return_when=asyncio.ALL_COMPLETED
-        )
-        if pending:  # TODO: remove, not needed but for sure  # pylint: disable=fixme
-            raise ValueError("There are still pending tasks!")
-        return {task_mapping[task]: task.result() for task in done}
+        async with self:
+            return await self._download_all(urls)
 
 
 class SomeFirstDownloader(BaseDownloader):
@@ -148,70 +222,34 @@ class SomeFirstDownloader(BaseDownloader):
 
         :return: dict of urls and responses(dict or json)
         """
-        task_mapping = {}
-
-        for url in urls:
-            task = asyncio.ensure_future(self._download_from_url(url))
-            task_mapping[task] = url
-
-        results = {}
-        pending = task_mapping.keys()
-
-        while pending:
-            done, pending = await asyncio.wait(  # type: ignore
-                pending, return_when=asyncio.FIRST_COMPLETED
-            )
-            if [task for task in done if self.is_good_response(task.result())]:
-                # at least one good!
-                break
-
-        for task in pending:
-            # pending to stop
-            task.cancel()
-
-        for url, task in task_mapping.items():  # type: ignore
+        is_good_response = self.is_good_response
+        async with self:
+            tasks = [asyncio.create_task(self._download_from_url(url)) for url in urls]
             try:
-                results[url] = await task
-            except (  # pylint: disable=broad-except
-                Exception,
-                asyncio.CancelledError,
-            ) as exc:
-                results[url] = exc  # type: ignore
+                for next_done in asyncio.as_completed(tasks):
+                    if is_good_response(await next_done):
+                        # at least one good!
+                        break
+            finally:
+                for task in tasks:
+                    # pending to stop
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        # all the tasks are finished, collect without awaiting
+        results: Dict[str, Any] = {}
+        for url, task in zip(urls, tasks):
+            if task.cancelled():
+                results[url] = asyncio.CancelledError()
+            elif task.exception() is not None:
+                results[url] = task.exception()
+            else:
+                results[url] = task.result()
 
         good, _ = self.filter_responses(results)
         return good if good else results
 
 
-class _PendingCounter:
-    """Utility to count amount of downloads in pending."""
-
-    def __init__(self) -> None:
-        """Init."""
-        self._counter = 0
-
-    def inc(self) -> None:
-        """Increment counter."""
-        self._counter += 1
-
-    def dec(self) -> None:
-        """
-        Decrement counter.
-
-        :raises ValueError: if counter is going below 0
-        """
-        if self._counter == 0:
-            raise ValueError("counter can not be dec!")
-        self._counter -= 1
-
-    def is_empty(self) -> bool:
-        """
-        Check counter is 0.
-
-        :return: bool
-        """
-        return self._counter == 0
-
-
 class SmartDownloader(BaseDownloader):
     """
     A smart downloader implementation.
@@ -231,80 +269,59 @@ class SmartDownloader(BaseDownloader):
         :param concurrent_requests: int, amount of concurent requests
         :param stop_on_first_result: bool, wait for the first success download and stop.
         """
+        super().__init__()
         self._concurrent_requests = concurrent_requests
         self._stop_on_first_result = stop_on_first_result
 
-    async def _worker(
-        self,
-        in_queue: asyncio.Queue,
-        out_queue: asyncio.Queue,
-        pending: _PendingCounter,
-    ) -> None:
+    def _get_connections_limit(self) -> int:
         """
-        Get url from in queue and put result to out queue.
+        Get connections pool size of the session, same as concurrent requests amount.
 
-        :param in_queue: queue for incoming urls
-        :param out_queue: queue for processed urls
-        :param pending: pending tasks counter.
+        :return: max amount of connections, 0 for no limit
+        """
+        return self._concurrent_requests
 
-        :raises asyncio.CancelledError: asyncio.CancelledError
+    async def iter_download(
+        self, urls: List[str]
+    ) -> AsyncGenerator[Tuple[str, Union[Dict, Exception]], None]:
         """
-        while not in_queue.empty():
-            url = await in_queue.get()
-            pending.inc()
-            try:
-                result = await self._download_from_url(url)
-                await out_queue.put((url, result))
-            except asyncio.CancelledError as exc:
-                await out_queue.put((url, exc))
-                raise
-            except Exception as exc:  # pylint: disable=broad-except
-                await out_queue.put((url, exc))
-            finally:
-                pending.dec()
+        Download data from urls, yield every response as soon as it is downloaded.
 
-    @asynccontextmanager  # type: ignore
-    async def _workers_ctx(  # type: ignore
-        self, urls: List[str], num: int = 0
-    ) -> Tuple[asyncio.Queue, asyncio.Queue, _PendingCounter]:
-        """Set worker context.
+        Downloads not finished yet are cancelled when the iteration is stopped.
+        On stop on first result the responses downloaded meanwhile are yielded too.
 
-        set workers and cleanup on content exit
+        :param urls: list of url strings
 
-        :param urls: list of urls
-        :param num: int, amount of workers
-        :yield: in_queue, out_queue, pending_counter.
+        :yield: pairs of url and response(dict or exception)
         """
-        workers = set()
+        semaphore = asyncio.Semaphore(self._concurrent_requests or len(urls))
 
-        try:
-            num = num or len(urls)
-            num = min(num, len(urls))
-            pending = _PendingCounter()
-            in_queue: asyncio.Queue = asyncio.Queue()
-            for url in urls:
-                await in_queue.put(url)
-            out_queue: asyncio.Queue = asyncio.Queue()  # type: ignore
-
-            workers = {
-                asyncio.ensure_future(self._worker(in_queue, out_queue, pending))
-                for _ in range(num)
-            }
-
-            yield (in_queue, out_queue, pending)
-        finally:
-            # cancel workers
-            for task in workers:
-                if not task.done():
-                    task.cancel()
+        async def _download(url: str) -> Tuple[str, Union[Dict, Exception]]:
+            async with semaphore:
+                return url, await self._download_from_url(url)
 
-            # wait to be cancelled
-            await asyncio.wait(workers, return_when=asyncio.ALL_COMPLETED)
-
-            # get results
-            for task in workers:
-                with suppress(asyncio.CancelledError):
-                    await task
+        stop_on_first_result = self._stop_on_first_result
+        is_good_response = self.is_good_response
+        async with self:
+            tasks = [asyncio.create_task(_download(url)) for url in urls]
+            downloaded = set()
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    url, result = await next_done
+                    downloaded.add(url)
+                    yield url, result
+                    if stop_on_first_result and is_good_response(result):
+                        # got result with non expcetion reponse, stop it,
+                        # but keep the ones downloaded meanwhile
+                        for task in tasks:
+                            if task.done() and task.result()[0] not in downloaded:
+                                yield task.result()
+                        break
+            finally:
+                for task in tasks:
+                    task.cancel()
+                # wait to be cancelled
+                await asyncio.gather(*tasks, return_exceptions=True)
 
     async def download(self, urls: List[str]) -> Dict[str, Union[Dict, Exception]]:
         """
@@ -314,31 +331,16 @@ class SmartDownloader(BaseDownloader):
 
         :return: dict of urls and responses(dict or json)
         """
-        results = {}
-
-        async with self._workers_ctx(urls, num=self._concurrent_requests) as (  # type: ignore
-            in_queue,
-            out_queue,
-            pending,
-        ):
-            # do while some in in queue or pending urls
-            while not in_queue.empty() or not pending.is_empty():  # type: ignore
-                url, result = await out_queue.get()  # type: ignore
+        results: Dict[str, Any] = {}
+        async with aclosing(self.iter_download(urls)) as downloads:
+            async for url, result in downloads:
                 results[url] = result
-                if self._stop_on_first_result and self.is_good_response(result):
-                    # got result with non expcetion reponse, stop it
-                    break
-
-        # get results from cancelled tasks
-        while not out_queue.empty():  # type: ignore
-            url, result = await out_queue.get()  # type: ignore
-            results[url] = result
 
         # set remain urls to cancelled
-        while not in_queue.empty():  # type: ignore
-            url = await in_queue.get()  # type: ignore
-            results[url] = asyncio.CancelledError(
-                "cancelled cause first good results recevied"
+        for url in urls:
+            results.setdefault(
+                url,
+                asyncio.CancelledError("cancelled cause first good results recevied"),
             )
 
         good, _ = self.filter_responses(results)
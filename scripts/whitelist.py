@@ -1,6 +1,8 @@
-_load_key  # unused method (open_autonomy_client/client.py:64)
 Client  # unused class (open_autonomy_client/client.py:100)
 fetch_sync  # unused method (open_autonomy_client/client.py:251)
 SimpleDownloader  # unused class (open_autonomy_client/downloader.py:100)
 AllInParallelDownloader  # unused class (open_autonomy_client/downloader.py:114)
 SomeFirstDownloader  # unused class (open_autonomy_client/downloader.py:140)
+check  # unused method (open_autonomy_client/client.py:72)
+exc_info  # unused variable (open_autonomy_client/downloader.py:48)
+download  # unused method (open_autonomy_client/downloader.py:284)
@@ -22,15 +22,18 @@
 """Tests for the Client."""
 
 
+import asyncio
 import json
+import math
+from concurrent.futures import ThreadPoolExecutor
 from hashlib import sha256
-from typing import Any, Dict, List, Union, cast
+from typing import Any, Dict, List, Optional, Tuple, Union, cast
 from unittest.mock import patch
 
 import pytest
 from eth_account import Account
 
-from open_autonomy_client.client import Client
+from open_autonomy_client.client import Client, SignatureChecker, new_event_loop
 
 
 def generate_key() -> Account:
@@ -39,37 +42,184 @@ def generate_key() -> Account:
     return account
 
 
-def make_data_signature(key: Account, data: str) -> str:
-    """Get the signature of the given key on the given data."""
-    hash_hex = sha256(data.encode("ascii")).hexdigest()
+def make_data_signature(key: Account, hash_hex: str) -> str:
+    """Get the signature of the given key on the given data hash."""
     signature = key.signHash(hash_hex)
     return signature.signature.hex()[2:]  # cut 0x prefix
 
 
 def make_url_data_response(data: str, keys: List[Account]) -> Dict[str, Any]:
     """Create a dummy response."""
+    hash_hex = sha256(data.encode("ascii")).hexdigest()
     return {
         "payload": data,
-        "signatures": {key.address: make_data_signature(key, data) for key in keys},
+        "signatures": {key.address: make_data_signature(key, hash_hex) for key in keys},
     }
 
 
+def make_client(
+    num_agents: int,
+    payload: Union[str, List[str]],
+    signing_keys: Optional[slice] = None,
+    **client_kwargs: Any,
+) -> Tuple[Client, Dict[str, Dict[str, Any]]]:
+    """Create a client of generated agents, and the agents responses by url.
+
+    Every agent responds with the payload, or with its own one if payloads listed.
+    The payload is signed by all the agents keys, or by the slice of keys given.
+    """
+    priv_keys = [generate_key() for _ in range(num_agents)]
+    urls_list = [f"http://host{i}.com" for i in range(num_agents)]
+    payloads = [payload] * num_agents if isinstance(payload, str) else payload
+    signers = priv_keys[signing_keys or slice(None)]
+    responses = {data: make_url_data_response(data, signers) for data in payloads}
+    client = Client(
+        urls=urls_list, keys=[key.address for key in priv_keys], **client_kwargs
+    )
+    url_data_responses = {
+        url: responses[data] for url, data in zip(urls_list, payloads)
+    }
+    return client, url_data_responses
+
+
+def patch_downloads(client: Client, url_data_responses: Dict[str, Any]) -> Any:
+    """Patch the client downloader to respond with the given data."""
+    return patch.object(
+        client._downloader,  # pylint: disable=protected-access
+        "_download_from_url",
+        side_effect=url_data_responses.get,
+    )
+
+
 @pytest.mark.asyncio
 async def test_client_data_generated() -> None:
     """Test client with generated data."""
-    num_agents = 5
     sample_payload = '{"some": "data"}'
-    priv_keys = [generate_key() for _ in range(num_agents)]
+    client, url_data_responses = make_client(5, sample_payload)
+    with patch_downloads(client, url_data_responses):
+        data_fetched = await client.fetch()
+    assert data_fetched == json.loads(sample_payload)
 
-    urls_list = [f"http://host{i}.com" for i in range(num_agents)]
-    pub_keys_list = [i.address for i in priv_keys]
 
-    url_data_response = make_url_data_response(sample_payload, priv_keys)
-    url_data_responses = {url: url_data_response for url in urls_list}
-    client = Client(urls=urls_list, keys=pub_keys_list)
-    with patch.object(client, "_fetch_data_from_urls", return_value=url_data_responses):
+def test_client_data_generated_sync() -> None:
+    """Test sync client with generated data."""
+    sample_payload = '{"some": "data"}'
+    client, url_data_responses = make_client(3, sample_payload)
+    with client, patch_downloads(client, url_data_responses), patch(
+        "open_autonomy_client.client.new_event_loop", wraps=new_event_loop
+    ) as new_loop_mock:
+        for _ in range(2):
+            assert client.fetch_sync() == json.loads(sample_payload)
+    assert new_loop_mock.call_count == 1
+
+
+def test_client_data_generated_sync_threads() -> None:
+    """Test sync client used from several threads, every thread runs its own loop."""
+    sample_payload = '{"some": "data"}'
+    client, url_data_responses = make_client(3, sample_payload)
+    loops = []
+
+    def fetch_sync() -> Dict:
+        with client:
+            loops.append(client._get_loop())  # pylint: disable=protected-access
+            return client.fetch_sync()
+
+    with patch_downloads(client, url_data_responses), ThreadPoolExecutor(2) as pool:
+        results = list(pool.map(lambda _: fetch_sync(), range(2)))
+    assert results == [json.loads(sample_payload)] * 2
+    assert loops[0] is not loops[1]
+    assert all(loop.is_closed() for loop in loops)
+
+
+@pytest.mark.asyncio
+async def test_client_payload_big_integers() -> None:
+    """Test payload integers wider than 64 bits are decoded exactly."""
+    sample_payload = json.dumps({"balance_wei": 2**256 - 1, "ratio": float("nan")})
+    client, url_data_responses = make_client(2, sample_payload)
+    with patch_downloads(client, url_data_responses):
         data_fetched = await client.fetch()
-    assert data_fetched == json.loads(sample_payload)
+    assert data_fetched["balance_wei"] == 2**256 - 1
+    assert isinstance(data_fetched["balance_wei"], int)
+    assert math.isnan(data_fetched["ratio"])
+
+
+@pytest.mark.asyncio
+async def test_client_signatures_verified_once() -> None:
+    """Test same signatures from different urls are verified once."""
+    num_agents = 4
+    client, url_data_responses = make_client(num_agents, '{"some": "data"}')
+    with patch_downloads(client, url_data_responses), patch.object(
+        SignatureChecker, "check_hash", wraps=SignatureChecker.check_hash
+    ) as check_mock:
+        await client.fetch()
+    assert check_mock.call_count == num_agents
+
+
+@pytest.mark.asyncio
+async def test_client_signatures_verified_while_downloading() -> None:
+    """Test signatures verification starts before the last download finished."""
+    sample_payload = '{"some": "data"}'
+    client, url_data_responses = make_client(3, sample_payload, concurrent_requests=0)
+    urls_list = list(url_data_responses)
+    events: List[str] = []
+    check_hash = SignatureChecker.check_hash
+
+    async def download(url: str) -> Dict[str, Any]:
+        await asyncio.sleep(0.1 * urls_list.index(url))
+        events.append("downloaded")
+        return url_data_responses[url]
+
+    def verify(*args: Any) -> None:
+        events.append("verified")
+        check_hash(*args)
+
+    with patch.object(
+        client._downloader,  # pylint: disable=protected-access
+        "_download_from_url",
+        side_effect=download,
+    ), patch.object(SignatureChecker, "check_hash", side_effect=verify):
+        assert await client.fetch() == json.loads(sample_payload)
+    assert events.index("verified") < len(events) - 1 - events[::-1].index("downloaded")
+
+
+@pytest.mark.asyncio
+async def test_client_payload_differs() -> None:
+    """Test client raises if agents responded with different payloads."""
+    client, url_data_responses = make_client(
+        3, [f'{{"some": "data{i % 2}"}}' for i in range(3)]
+    )
+    urls_list = list(url_data_responses)
+    with patch_downloads(client, url_data_responses):
+        with pytest.raises(ValueError, match="payload differs") as exc_info:
+            await client.fetch()
+    assert str(urls_list[::2]) in str(exc_info.value)
+    assert str(urls_list[1::2]) in str(exc_info.value)
+
+
+@pytest.mark.asyncio
+async def test_client_signature_missing() -> None:
+    """Test client raises if there is no signature for some registered key."""
+    client, url_data_responses = make_client(
+        3, '{"some": "data"}', signing_keys=slice(1, None)
+    )
+    with patch_downloads(client, url_data_responses):
+        with pytest.raises(ValueError, match="No signatures found for keys"):
+            await client.fetch()
+
+
+@pytest.mark.parametrize("use_coincurve", [True, False])
+def test_signature_checker_backends(use_coincurve: bool) -> None:
+    """Test signature checker with both public key recovery backends."""
+    if use_coincurve:
+        pytest.importorskip("coincurve")
+    key, other_key = generate_key(), generate_key()
+    data = '{"some": "data"}'
+    signature = make_data_signature(key, sha256(data.encode("ascii")).hexdigest())
+
+    with patch("open_autonomy_client.client.USE_COINCURVE", use_coincurve):
+        SignatureChecker.check(key.address, signature, data)
+        with pytest.raises(ValueError, match="signature verification failed"):
+            SignatureChecker.check(other_key.address, signature, data)
 
 
 DATA_FROM_AGENT: Dict[str, Union[str, Dict[str, str]]] = {
@@ -103,7 +253,7 @@ async def test_client_data_from_agent_example() -> None:
     url_data_response = DATA_FROM_AGENT
     url_data_responses = {url: url_data_response}
     client = Client(urls=urls_list, keys=pub_keys_list)
-    with patch.object(client, "_fetch_data_from_urls", return_value=url_data_responses):
+    with patch_downloads(client, url_data_responses):
         data_fetched = await client.fetch()
     assert data_fetched == json.loads(sample_payload)
 
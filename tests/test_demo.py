@@ -50,8 +50,8 @@ async def test_client_test_demo_staging() -> None:
 
 def test_sync_client_test_demo_staging() -> None:
     """Test the Client with sync fetching."""
-    client = Client(urls=staging_agents_urls_list, keys=staging_pub_keys_list)
-    data_fetched = client.fetch_sync()
+    with Client(urls=staging_agents_urls_list, keys=staging_pub_keys_list) as client:
+        data_fetched = client.fetch_sync()
     assert "estimate" in data_fetched
 
 
@@ -22,7 +22,9 @@
 """Tests the downloader."""
 
 
-from typing import Callable
+import asyncio
+from typing import Callable, Dict, Union
+from unittest.mock import patch
 
 import pytest
 
@@ -52,5 +54,155 @@ async def test_downloader_real_links(downloader_class: Callable) -> None:
     await downloader.download(demo_urls)
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "downloader_class",
+    [SimpleDownloader, AllInParallelDownloader, SomeFirstDownloader, SmartDownloader],
+)
+async def test_downloader_bad_url(downloader_class: Callable) -> None:
+    """Test an url failing with a non http error is reported as its response."""
+    bad_url = "http://a..b/"  # empty idna label
+    results = await downloader_class().download([bad_url])
+    assert isinstance(results[bad_url], UnicodeError)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "downloader_class",
+    [SimpleDownloader, AllInParallelDownloader, SomeFirstDownloader, SmartDownloader],
+)
+async def test_downloader_session_shared(downloader_class: Callable) -> None:
+    """Test the downloads share one http session closed after the batch."""
+    downloader = downloader_class()
+    sessions = []
+
+    async def download(url: str) -> Dict:
+        sessions.append(downloader._get_session())  # pylint: disable=protected-access
+        return {"url": url}
+
+    urls = [f"http://host{i}" for i in range(4)]
+    with patch.object(downloader, "_download_from_url", side_effect=download):
+        await downloader.download(urls)
+    assert sessions
+    assert all(session is sessions[0] for session in sessions)
+    assert sessions[0].closed
+
+
+def test_filter_responses() -> None:
+    """Test responses are split in good and bad ones."""
+    error = ValueError("download failed")
+    assert SmartDownloader.filter_responses({"a": {}, "b": error, "c": {"c": 1}}) == (
+        {"a": {}, "c": {"c": 1}},
+        {"b": error},
+    )
+    assert SmartDownloader.filter_responses({"a": {}}) == ({"a": {}}, {})
+
+
+@pytest.mark.asyncio
+async def test_downloader_concurrent_batches() -> None:
+    """Test a batch finishing first does not close the session of another one."""
+    downloader = SmartDownloader(concurrent_requests=0, stop_on_first_result=False)
+
+    async def download(url: str) -> Dict:
+        session = downloader._get_session()  # pylint: disable=protected-access
+        await asyncio.sleep(0.05 if "slow" in url else 0.01)
+        return {"closed": session.closed}
+
+    with patch.object(downloader, "_download_from_url", side_effect=download):
+        fast, slow = await asyncio.gather(
+            downloader.download(["http://fast0", "http://fast1"]),
+            downloader.download(["http://slow0", "http://slow1"]),
+        )
+    assert fast == {url: {"closed": False} for url in ["http://fast0", "http://fast1"]}
+    assert slow == {url: {"closed": False} for url in ["http://slow0", "http://slow1"]}
+    assert downloader._session is None  # pylint: disable=protected-access
+
+
+async def fake_download(url: str) -> Union[Dict, Exception]:
+    """Fake download: url index defines the delay, the first url fails."""
+    index = int(url.rsplit("host", 1)[1])
+    await asyncio.sleep(0.01 * index)
+    if index == 0:
+        return ValueError("download failed")
+    return {"index": index}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "stop_on_first_result, expected",
+    [(True, [1]), (False, [1, 2, 3])],
+)
+async def test_smart_downloader_stop_on_first_result(
+    stop_on_first_result: bool, expected: list
+) -> None:
+    """Test the smart downloader returns good responses only."""
+    urls = [f"http://host{i}" for i in range(4)]
+    downloader = SmartDownloader(
+        concurrent_requests=0, stop_on_first_result=stop_on_first_result
+    )
+    with patch.object(downloader, "_download_from_url", side_effect=fake_download):
+        results = await downloader.download(urls)
+    assert results == {f"http://host{i}": {"index": i} for i in expected}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("concurrent_requests", [0, 2])
+async def test_smart_downloader_connections_limit(concurrent_requests: int) -> None:
+    """Test the smart downloader pool size matches concurrent requests."""
+    async with SmartDownloader(concurrent_requests=concurrent_requests) as downloader:
+        session = downloader._get_session()  # pylint: disable=protected-access
+        assert session.connector is not None
+        assert session.connector.limit == concurrent_requests
+
+
+@pytest.mark.asyncio
+async def test_some_first_downloader_first_good() -> None:
+    """Test the some first downloader returns the first good response."""
+    urls = [f"http://host{i}" for i in range(4)]
+    downloader = SomeFirstDownloader()
+    with patch.object(downloader, "_download_from_url", side_effect=fake_download):
+        results = await downloader.download(urls)
+    assert results == {"http://host1": {"index": 1}}
+
+
+@pytest.mark.asyncio
+async def test_smart_downloader_keeps_downloaded_on_stop() -> None:
+    """Test responses downloaded before the first result is handled are kept."""
+    urls = [f"http://host{i}" for i in range(1, 4)]
+    downloader = SmartDownloader(concurrent_requests=0, stop_on_first_result=True)
+    received = []
+    with patch.object(downloader, "_download_from_url", side_effect=fake_download):
+        async for url, _ in downloader.iter_download(urls):
+            received.append(url)
+            # other downloads finish meanwhile
+            await asyncio.sleep(0.05)
+    assert received == urls
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("concurrent_requests", [1, 2, 3])
+async def test_smart_downloader_concurrent_requests(concurrent_requests: int) -> None:
+    """Test the smart downloader caps the requests in flight."""
+    in_flight = []
+    max_in_flight = 0
+
+    async def download(url: str) -> Dict:
+        nonlocal max_in_flight
+        in_flight.append(url)
+        max_in_flight = max(max_in_flight, len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.remove(url)
+        return {"url": url}
+
+    urls = [f"http://host{i}" for i in range(6)]
+    downloader = SmartDownloader(
+        concurrent_requests=concurrent_requests, stop_on_first_result=False
+    )
+    with patch.object(downloader, "_download_from_url", side_effect=download):
+        results = await downloader.download(urls)
+    assert len(results) == len(urls)
+    assert max_in_flight == concurrent_requests
+
+
 if __name__ == "__main__":
     pytest.main([__file__])